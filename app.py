@@ -1,9 +1,18 @@
 import os
+import re
+import functools
 import time
 import logging
+import collections
+import threading
+import asyncio
+import requests as http_client
+from contextlib import asynccontextmanager
 from flask import Flask, render_template, request, flash, get_flashed_messages, jsonify, send_from_directory, send_file
-from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from dotenv import load_dotenv
+
+import browser_pool
 from datetime import datetime
 import smtplib
 from email.mime.text import MIMEText
@@ -28,16 +37,104 @@ app = Flask(__name__, static_folder='../web/dist', static_url_path='')
 # IMPORTANT: Set a strong secret key in your environment variables for production!
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'change-this-in-production-to-a-real-secret')
 
+def _make_in_memory_zip_engine(db_file_path):
+    """
+    Copy the uszipcode SQLite database file into an in-memory connection and
+    wrap it in a SQLAlchemy engine. The whole simple database is ~40k rows,
+    so it fits comfortably in RAM and every by_zipcode/by_coordinates call
+    skips file I/O entirely.
+    """
+    import sqlite3
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    source = sqlite3.connect(db_file_path)
+    # check_same_thread=False: the submission workers run in a thread pool
+    # and SQLite allows concurrent readers on one connection.
+    memory_conn = sqlite3.connect(':memory:', check_same_thread=False)
+    source.backup(memory_conn)
+    source.close()
+    return create_engine(
+        'sqlite://',
+        creator=lambda: memory_conn,
+        poolclass=StaticPool,
+    )
+
+def _make_search_engine(**kwargs):
+    """
+    Build a SearchEngine whose session is thread-local. The stock class
+    binds ONE sqlalchemy Session at construction time, and Sessions are not
+    safe to share across the request threads that all call
+    get_nearby_zip_codes concurrently; a scoped_session hands each thread
+    its own, over the same engine and connection pool.
+    """
+    from uszipcode import SearchEngine
+    from sqlalchemy import orm
+
+    class _ThreadSafeSearchEngine(SearchEngine):
+        def __init__(self, *args, **kw):
+            super().__init__(*args, **kw)
+            self._scoped_session = orm.scoped_session(orm.sessionmaker(bind=self.engine))
+
+        @property
+        def ses(self):
+            return self._scoped_session
+
+        @ses.setter
+        def ses(self, value):
+            # The parent __init__ assigns a plain Session here; ignore it in
+            # favor of the per-thread scoped_session.
+            pass
+
+    return _ThreadSafeSearchEngine(**kwargs)
+
 # Initialize zip code search engine (globally is fine)
 search = None
 try:
     from uszipcode import SearchEngine
+    # Build the default engine first so the database file is downloaded on
+    # first boot, then rebind to an in-memory copy of it: per-lookup latency
+    # drops from file-I/O milliseconds to RAM-read microseconds.
     search = SearchEngine()
-    logger.info("uszipcode SearchEngine initialized.")
+    try:
+        _memory_engine = _make_in_memory_zip_engine(search.db_file_path)
+        search.close()
+        search = _make_search_engine(engine=_memory_engine)
+        logger.info("uszipcode SearchEngine initialized (in-memory SQLite).")
+    except Exception as mem_err:
+        logger.warning(f"Could not load zip database into memory: {mem_err}. Falling back to the file-backed database.")
+        search.close()
+        search = _make_search_engine()
+        logger.info("uszipcode SearchEngine initialized (file-backed SQLite).")
 except Exception as e:
     logger.error(f"Failed to initialize or import uszipcode SearchEngine: {e}. Nearby zip code search will be disabled.")
     search = None # Set search to None if initialization fails
 
+# Build the in-process spatial index over zip centroids. Radius queries then
+# stay entirely in RAM (grid buckets + haversine) instead of going through
+# SQLAlchemy row materialization for every wave of retries.
+zip_search_index = None
+if search:
+    try:
+        from zip_index import ZipIndex
+        zip_search_index = ZipIndex.from_engine(search.engine)
+    except Exception as e:
+        logger.error(f"Failed to build in-process zip index: {e}. Falling back to uszipcode queries.")
+        zip_search_index = None
+
+# Pre-warm the persistent browser pool so submissions never pay the Chromium
+# launch cost (hundreds of ms to seconds plus ~500 MB RSS per launch).
+# Skipped in test mode, where no real browser is ever used, and when this
+# module IS the `python app.py` bootstrap: that path just execs gunicorn,
+# which would orphan any Chromium processes launched before the exec. The
+# gunicorn workers import this module as 'app' and warm their own pools.
+_BOOTSTRAPPING = __name__ == '__main__'
+if not _BOOTSTRAPPING and os.environ.get('TEST_MODE', '0') != '1' and os.environ.get('RENDER', '0') != '1':
+    try:
+        browser_pool.init_pool()
+    except Exception as e:
+        logger.error(f"Failed to initialize browser pool: {e}. Submissions will fall back to direct launches.")
+
 # Proxy configuration from environment variables
 PROXY_HOST = os.environ.get('PROXY_HOST')
 PROXY_PORT = os.environ.get('PROXY_PORT')
@@ -63,6 +160,77 @@ STATUS_PROXY_CONNECT_FAIL = 'PROXY_CONNECT_FAIL'
 STATUS_NAVIGATION_FAIL = 'NAVIGATION_FAIL'
 STATUS_AUTOMATION_FAIL = 'AUTOMATION_FAIL'
 STATUS_UNKNOWN_FAIL = 'UNKNOWN_FAIL'
+# Internal to the retry fan-out: the attempt stood down because another
+# attempt for the same inbound lead claimed the actual submission.
+STATUS_SKIPPED = 'SKIPPED'
+
+# --- Proxy Error Classification ---
+# One precompiled taxonomy instead of chained substring checks scattered per
+# call site, so every error path classifies proxy trouble the same way.
+_PROXY_ERR_RE = re.compile(r'proxy|tunnel|epipe|timeout', re.IGNORECASE)
+
+def _classify_playwright_error(err, fallback=STATUS_NAVIGATION_FAIL):
+    """
+    Maps a Playwright error to a status constant. Anything that smells like
+    a dead proxy tunnel (proxy/tunnel/EPIPE/timeout) is
+    STATUS_PROXY_CONNECT_FAIL -- the retry loop treats those as "try the
+    next zip" -- and everything else gets the caller's fallback status.
+    """
+    if _PROXY_ERR_RE.search(str(err)):
+        return STATUS_PROXY_CONNECT_FAIL
+    return fallback
+
+# --- Proxy Zip Status Cache ---
+# DataImpulse has no exit node for some zips, and discovering that costs a
+# full proxy-connect timeout every time. Remember each zip's last attempt
+# outcome for a short TTL so waves skip zips that just burned a timeout and
+# keep retrying zips that recently worked.
+PROXY_ZIP_STATUS_TTL = int(os.environ.get('PROXY_ZIP_STATUS_TTL', '600'))  # seconds
+_PROXY_ZIP_STATUS_MAX = 10000
+_proxy_zip_status = {}  # zip -> (status, monotonic timestamp)
+_proxy_zip_status_lock = threading.Lock()
+
+def record_zip_proxy_status(zip_code, status):
+    """Remembers the outcome of a proxy attempt for one zip."""
+    now = time.monotonic()
+    with _proxy_zip_status_lock:
+        if len(_proxy_zip_status) >= _PROXY_ZIP_STATUS_MAX:
+            # Drop expired entries first; fall back to clearing outright
+            # rather than growing without bound.
+            expired = [z for z, (_, ts) in _proxy_zip_status.items()
+                       if now - ts > PROXY_ZIP_STATUS_TTL]
+            for z in expired:
+                del _proxy_zip_status[z]
+            if len(_proxy_zip_status) >= _PROXY_ZIP_STATUS_MAX:
+                _proxy_zip_status.clear()
+        _proxy_zip_status[zip_code] = (status, now)
+
+# --- Proxy IP Verification ---
+# The ipify round-trip exists purely to log the exit IP; it costs a full
+# page load through the residential proxy (500 ms to seconds, 30 s worst
+# case) per lead. Off by default; with VERIFY_PROXY_IP=1 each proxy user
+# (which encodes the zip) is verified at most once per TTL window.
+VERIFY_PROXY_IP = os.environ.get('VERIFY_PROXY_IP', '0') == '1'
+PROXY_VERIFY_TTL = int(os.environ.get('PROXY_VERIFY_TTL', '600'))  # seconds
+_proxy_verified_cache = {}  # proxy username -> monotonic timestamp; pool-loop only
+
+def _should_verify_proxy(proxy_user):
+    """Whether this proxy user still needs an ipify verification pass."""
+    if not VERIFY_PROXY_IP:
+        return False
+    verified_at = _proxy_verified_cache.get(proxy_user)
+    return verified_at is None or time.monotonic() - verified_at > PROXY_VERIFY_TTL
+
+def zip_proxy_recently_failed(zip_code):
+    """Whether this zip hit PROXY_CONNECT_FAIL within the TTL window."""
+    with _proxy_zip_status_lock:
+        entry = _proxy_zip_status.get(zip_code)
+    if entry is None:
+        return False
+    status, ts = entry
+    if time.monotonic() - ts > PROXY_ZIP_STATUS_TTL:
+        return False
+    return status == STATUS_PROXY_CONNECT_FAIL
 
 # --- Email Functions ---
 def send_email_notification(prospect_data, proxy_ip=None):
@@ -139,25 +307,52 @@ def get_proxy_for_phone(phone):
 
 # --- Helper Functions ---
 
+@functools.lru_cache(maxsize=4096)
 def get_nearby_zip_codes(target_zip, radius_miles=10, max_results=5):
     """
     Get nearby zip codes within a specified radius using uszipcode.
+
+    Zip geometry never changes at runtime, so results are memoized per
+    (target_zip, radius_miles, max_results); repeat submissions from the same
+    area skip the SQLite lookups entirely. The return value is a tuple (not a
+    list) so the cached object stays immutable -- call list(...) if you need
+    to mutate it.
     Args:
         target_zip (str): The target zip code.
         radius_miles (int): Radius in miles to search.
         max_results (int): Maximum number of nearby zips to return.
     Returns:
-        list: List of nearby zip code strings, excluding the target zip, sorted by distance.
+        tuple: Nearby zip code strings, excluding the target zip, sorted by distance.
     """
+    # Fast path: the in-process spatial index answers the whole query from
+    # RAM, nearest-first, without touching SQLite.
+    if zip_search_index:
+        try:
+            target_coords = zip_search_index.coords(target_zip)
+            if not target_coords:
+                logger.warning(f"Could not find coordinates for target zip code {target_zip}.")
+                return ()
+            zip_codes = zip_search_index.nearby(
+                target_coords[0],
+                target_coords[1],
+                radius_miles,
+                max_results,
+                exclude=str(target_zip)
+            )
+            logger.info(f"Found {len(zip_codes)} nearby zip codes for {target_zip} within {radius_miles} miles: {zip_codes}")
+            return tuple(zip_codes)
+        except Exception as e:
+            logger.error(f"In-process zip index lookup failed for {target_zip}: {e}. Falling back to uszipcode.", exc_info=True)
+
     if not search:
         logger.error("uszipcode search engine not available.")
-        return []
+        return ()
     try:
         # 1. Find the coordinates of the target zip code first
         target_zip_obj = search.by_zipcode(target_zip)
         if not target_zip_obj:
             logger.warning(f"Could not find coordinates for target zip code {target_zip}.")
-            return [] # Cannot search by coordinates if target isn't found
+            return () # Cannot search by coordinates if target isn't found
 
         target_lat = target_zip_obj.lat
         target_lng = target_zip_obj.lng
@@ -165,7 +360,7 @@ def get_nearby_zip_codes(target_zip, radius_miles=10, max_results=5):
         # Check if coordinates were actually found
         if target_lat is None or target_lng is None:
              logger.warning(f"Coordinates are missing for target zip code {target_zip} in the database.")
-             return []
+             return ()
 
         # 2. Search by coordinates using the found lat/lon and the desired radius
         #    Request more than max_results initially because the list includes the target zip itself.
@@ -179,7 +374,7 @@ def get_nearby_zip_codes(target_zip, radius_miles=10, max_results=5):
 
         if not nearby_results:
             logger.info(f"No zip codes found within {radius_miles} miles of {target_zip} coordinates.")
-            return []
+            return ()
 
         # 3. Process results: Extract zip codes, filter out the original target, limit count
         zip_codes = []
@@ -200,14 +395,26 @@ def get_nearby_zip_codes(target_zip, radius_miles=10, max_results=5):
 
 
         logger.info(f"Found {len(zip_codes)} nearby zip codes for {target_zip} within {radius_miles} miles: {zip_codes}")
-        return zip_codes
+        return tuple(zip_codes)
 
     except Exception as e:
         # Catch other potential errors during lookup
         logger.error(f"Error finding nearby zip codes for {target_zip} (radius {radius_miles}): {str(e)}", exc_info=True)
-        return []
+        return ()
 
 # (Place near top of file, after imports/config)
+# User agent presented both by Playwright contexts and the HTTP fast path.
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Try a plain HTTP POST before spinning up a browser context. A successful
+# POST costs 1-2 seconds and a few KB of RAM where the Playwright path costs
+# 5-10 seconds and a rendering pipeline; any HTTP-path failure falls back to
+# the full browser submission, so the worst case only adds one request.
+# Opt-in: the path only claims success when the site's configured
+# success_marker and lead_id_pattern both confirm an accepted submission,
+# and neither has been captured for the current sites yet.
+HTTP_SUBMIT_ENABLED = os.environ.get('HTTP_SUBMIT_ENABLED', '0') == '1'
+
 SITE_CONFIG = {
     'elderlyhealth': {
         'url': 'https://elderlyhealthquotes.com/medicareplans/',
@@ -217,7 +424,22 @@ SITE_CONFIG = {
             'phone': 'input[name="phoneno"]',
             'zip': 'input[name="zipcode"]',
             'consent': '#leadid_tcpa_disclosure',
-            'submit_button': 'input[name="finish"]'
+            'submit_button': 'input[name="finish"]',
+            'success_indicator': 'h4.modal-title:has-text("Thank You")'
+        },
+        # Captured from a manual Playwright run: the form self-posts its
+        # input names to the landing page. success_marker must be a string
+        # that ONLY a real acceptance response contains -- the thank-you
+        # modal markup is present (hidden) in the plain landing page, so it
+        # proves nothing. lead_id_pattern must capture the lead ID the
+        # acceptance response echoes back. Both are unset until captured
+        # from a confirmed acceptance; the fast path stays inert until then.
+        'http_post': {
+            'action': 'https://elderlyhealthquotes.com/medicareplans/',
+            'fields': {'fname': 'full_name', 'phoneno': 'phone', 'zipcode': 'zip'},
+            'extra_fields': {'leadid_tcpa_disclosure': 'on', 'finish': '1'},
+            'success_marker': None,
+            'lead_id_pattern': None
         }
     },
     'seniorsinsurance': {
@@ -228,21 +450,449 @@ SITE_CONFIG = {
             'phone': 'input[name="phoneno"]',
             'zip': 'input[name="zipcode"]',
             'consent': '#leadid_tcpa_disclosure',
-            'submit_button': 'button[type="submit"][name="finish"]'
+            'submit_button': 'button[type="submit"][name="finish"]',
+            'success_indicator': 'h4.modal-title:has-text("Thank You")'
+        },
+        'http_post': {
+            'action': 'https://seniorsinsurancequotes.com/',
+            'fields': {'fname': 'full_name', 'phoneno': 'phone', 'zipcode': 'zip'},
+            'extra_fields': {'leadid_tcpa_disclosure': 'on', 'finish': '1'},
+            'success_marker': None,
+            'lead_id_pattern': None
         }
     }
 }
 
-def submit_to_external_form_pw(prospect_data, target_site_key, dynamic_proxy_details=None):
+# --- Site Warm-up (storage_state snapshots) ---
+# A cold context replays every first-visit cookie/localStorage dance (consent
+# banners, analytics IDs, the LeadID beacon bootstrapping) before the form is
+# usable. A warm-up visit per site captures that state; every submission
+# context is then seeded with it via new_context(storage_state=...) and the
+# page comes up "returning visitor" fast. The warm-up goes through the same
+# DataImpulse gateway the submissions use (country-level, no zip targeting)
+# so the lead sites never see the server's own IP, and snapshots are
+# re-captured every STORAGE_STATE_TTL seconds so submissions don't all
+# replay one long-lived identity that their fraud checks could link.
+# The rendered-DOM set_content() variant was deliberately not used: the
+# Jornaya lead-id script must execute against the real origin, and
+# set_content serves under about:blank.
+STORAGE_STATE_TTL = int(os.environ.get('STORAGE_STATE_TTL', '600'))  # seconds
+_site_storage_state = {}  # site_key -> (storage_state dict, monotonic ts); pool-loop only
+
+def _fresh_storage_state(site_key):
+    """Returns the site's snapshot if it is within TTL, else None."""
+    entry = _site_storage_state.get(site_key)
+    if entry is None:
+        return None
+    state, captured_at = entry
+    if time.monotonic() - captured_at > STORAGE_STATE_TTL:
+        return None
+    return state
+
+async def warm_site_storage_state():
+    """Visits each configured site through the proxy and snapshots its
+    storage state."""
+    for site_key, site_info in SITE_CONFIG.items():
+        try:
+            async with _borrow_browser() as browser:
+                context_kwargs = {
+                    'user_agent': _USER_AGENT,
+                    'viewport': {'width': 1280, 'height': 720}
+                }
+                if PROXY_CONFIGURED:
+                    # Country-level exit via the base user; the per-zip
+                    # targeting only matters for the actual submissions.
+                    context_kwargs['proxy'] = {
+                        'server': f"http://{PROXY_HOST}:{PROXY_PORT}",
+                        'username': PROXY_BASE_USER,
+                        'password': PROXY_PASS
+                    }
+                context = await browser.new_context(**context_kwargs)
+                try:
+                    page = await context.new_page()
+                    await page.route("**/*", _block_nonessential_requests)
+                    await page.goto(site_info['url'], wait_until='domcontentloaded', timeout=60000)
+                    await page.locator(site_info['selectors']['submit_button']).wait_for(state='visible', timeout=20000)
+                    _site_storage_state[site_key] = (await context.storage_state(), time.monotonic())
+                    logger.info(f"Captured storage state for site '{site_key}'.")
+                finally:
+                    await context.close()
+        except Exception as e:
+            # Warm-up is purely an optimization; submissions work cold too.
+            logger.warning(f"Could not capture storage state for site '{site_key}': {e}")
+
+async def _storage_state_refresher():
+    """Keeps the snapshots fresh; runs forever on the pool loop."""
+    while True:
+        await warm_site_storage_state()
+        await asyncio.sleep(STORAGE_STATE_TTL)
+
+# --- Form Fill Script ---
+# Fills the form, checks consent, and reads the lead ID in ONE protocol
+# round-trip. The per-element locator calls this replaces each cost a CDP
+# round-trip (and could interleave with the page's own JS between steps);
+# doing it all inside one evaluate is both faster and atomic from the
+# page's point of view. Input/change events are dispatched because the
+# sites' validation scripts listen for them.
+_FILL_FORM_JS = """(args) => {
+    const { selectors, data } = args;
+    const setValue = (selector, value) => {
+        const el = document.querySelector(selector);
+        if (!el) return false;
+        el.value = value;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        return true;
+    };
+    const filled = setValue(selectors.full_name, data.full_name)
+        && setValue(selectors.phone, data.phone)
+        && setValue(selectors.zip, data.zip);
+    const consent = document.querySelector(selectors.consent);
+    if (consent && !consent.checked) {
+        consent.click();
+    }
+    const leadField = document.querySelector(selectors.lead_id_field);
+    return {
+        filled: filled,
+        consentChecked: !!(consent && consent.checked),
+        leadId: leadField ? leadField.value : null
+    };
+}"""
+
+# --- Request Interception ---
+# Subresource types that never affect a form submission. Aborting them gets
+# the form interactive in a fraction of the time and keeps proxy bandwidth
+# (billed per GB on DataImpulse) down. Stylesheets are NOT blocked: the
+# thank-you modal is present-but-hidden in the initial DOM and only CSS
+# keeps it hidden, so without styles the success indicator reads as visible
+# before anything was submitted.
+_BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+
+# Third-party analytics/ad hosts that keep the network busy long after the
+# form itself is usable. LeadID/TrustedForm scripts are deliberately NOT
+# listed -- they generate the lead id we capture.
+_BLOCKED_HOST_RE = re.compile(
+    r'googletagmanager|google-analytics|doubleclick|googlesyndication|facebook|hotjar',
+    re.IGNORECASE
+)
+
+async def _block_nonessential_requests(route):
+    """page.route handler: abort images/fonts/media and analytics hosts."""
+    req = route.request
+    if req.resource_type in _BLOCKED_RESOURCE_TYPES or _BLOCKED_HOST_RE.search(req.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+@asynccontextmanager
+async def _borrow_browser():
+    """
+    Yields a browser for one submission. Uses a pre-warmed browser from the
+    pool when available; otherwise falls back to a one-off direct launch
+    (the old per-submission behaviour). Runs on the browser pool's event
+    loop, like everything that touches Playwright.
+    """
+    if browser_pool.available():
+        async with browser_pool.browser_from_pool() as browser:
+            yield browser
+        return
+
+    logger.warning("Browser pool unavailable; falling back to direct browser launch.")
+    browser = await browser_pool.launch_browser()
+    logger.info("Browser launched directly (non-pooled).")
+    try:
+        yield browser
+    finally:
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.error(f"Error closing directly launched browser: {e}")
+
+# Kick off the site warm-up refresher in the background on the pool loop.
+# It is not awaited: submissions that start before the first capture simply
+# run with a cold context, exactly as before. Skipped in the gunicorn
+# bootstrap path for the same reason as the pool pre-warm above.
+if not _BOOTSTRAPPING and os.environ.get('TEST_MODE', '0') != '1' and os.environ.get('RENDER', '0') != '1':
+    try:
+        asyncio.run_coroutine_threadsafe(_storage_state_refresher(), browser_pool.ensure_loop())
+    except Exception as e:
+        logger.warning(f"Could not schedule site warm-up: {e}")
+
+class _SubmissionBatch:
+    """
+    Coalesces near-simultaneous submissions that share a proxy exit into one
+    BrowserContext. The first arrival (the leader) creates the context and
+    publishes it; later arrivals for the same (site, proxy user) join while
+    the leader's submission is still in flight and get their own page off
+    the shared context, skipping the proxy CONNECT handshake and the ipify
+    verification the leader already paid for. Lives entirely on the pool's
+    event loop, so plain counters are safe.
+    """
+
+    def __init__(self):
+        self.context_ready = asyncio.get_running_loop().create_future()
+        self.context = None
+        self._open = True
+        self._active = 1  # the leader
+        self._drained = asyncio.Event()
+        self._finished = False
+
+    def publish(self, context):
+        """Leader: make the shared context available to joiners."""
+        self.context = context
+        if not self.context_ready.done():
+            self.context_ready.set_result(context)
+
+    def join(self):
+        """Joiner: returns False once the batch has stopped accepting."""
+        if not self._open:
+            return False
+        self._active += 1
+        return True
+
+    def leave(self):
+        self._active -= 1
+        if self._active <= 0:
+            self._drained.set()
+
+    async def finish(self):
+        """Leader: stop new joiners, wait for active ones, close the context.
+
+        Idempotent: the second and later calls return immediately, so the
+        leader can call it both inside the borrow scope and from the outer
+        cleanup path that covers browser-acquisition failures.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self._open = False
+        if not self.context_ready.done():
+            # Context never materialized; wake joiners so they lead their own.
+            self.context_ready.set_result(None)
+        self.leave()
+        await self._drained.wait()
+        if self.context is not None:
+            try:
+                await self.context.close()
+                logger.info("Shared batch context closed.")
+            except Exception as e:
+                logger.error(f"Error closing shared batch context: {e}")
+
+# In-flight batches, keyed by (target_site_key, proxy username or None).
+_pending_batches = {}
+
+class _SubmitGate:
+    """
+    Ensures at most ONE external submission per inbound lead. The retry
+    waves race the proxy-connect/navigation stage in parallel, but filling
+    and submitting the live form is irreversible, so the first attempt to
+    reach a ready form claims the gate and every other attempt stands down
+    with STATUS_SKIPPED. Claims are keyed by asyncio task so the holder can
+    re-check the gate across its own stages (e.g. HTTP fast path falling
+    back to the browser path). Pool-loop only.
+    """
+
+    def __init__(self):
+        self._owner = None
+
+    def try_claim(self):
+        """True if this task now holds (or already held) the gate."""
+        task = asyncio.current_task()
+        if self._owner is None:
+            self._owner = task
+            return True
+        return self._owner is task
+
+    def release(self):
+        """
+        Owner only: give the gate back. Only valid when the claimed
+        submission provably never left the process (e.g. the HTTP fast
+        path's connection failed before anything was sent) -- otherwise a
+        second attempt could double-submit the lead.
+        """
+        if self._owner is asyncio.current_task():
+            self._owner = None
+
+def _http_submit_usable(target_site_key):
+    """
+    Whether the HTTP fast path can do anything for this site: it needs both
+    the acceptance marker and the lead-id pattern, otherwise the POST could
+    only claim false successes and the browser path stays authoritative.
+    Checked BEFORE claiming the submit gate so an inert config never costs
+    a claim.
+    """
+    http_conf = SITE_CONFIG.get(target_site_key, {}).get('http_post')
+    return bool(http_conf and http_conf.get('success_marker') and http_conf.get('lead_id_pattern'))
+
+def submit_to_external_form_http(prospect_data, target_site_key, dynamic_proxy_details=None):
+    """
+    Attempts the submission with a plain HTTP POST through the proxy,
+    replicating the browser's form post without paying for a rendering
+    pipeline.
+    Returns:
+        tuple: (result, posted). result is the usual (status, message,
+        lead_id) tuple only on a confirmed success -- the site's
+        success_marker present in the response AND a lead ID extracted via
+        lead_id_pattern -- or None to tell the caller to fall back to the
+        full Playwright submission. posted says whether the POST may have
+        reached the site; when False the caller knows nothing was sent and
+        may release the submit gate.
+    """
+    if not _http_submit_usable(target_site_key):
+        return None, False
+    http_conf = SITE_CONFIG[target_site_key]['http_post']
+    proxies = None
+    if dynamic_proxy_details:
+        proxy_url = (
+            f"http://{dynamic_proxy_details['user']}:{dynamic_proxy_details['pass']}"
+            f"@{dynamic_proxy_details['host']}:{dynamic_proxy_details['port']}"
+        )
+        proxies = {'http': proxy_url, 'https': proxy_url}
+    payload = {field: prospect_data[key] for field, key in http_conf['fields'].items()}
+    payload.update(http_conf.get('extra_fields', {}))
+    posted = False
+    try:
+        logger.info(f"Trying HTTP fast-path submission to {http_conf['action']}...")
+        response = http_client.post(
+            http_conf['action'],
+            data=payload,
+            proxies=proxies,
+            timeout=30,
+            headers={
+                'User-Agent': _USER_AGENT,
+                'Referer': SITE_CONFIG[target_site_key]['url']
+            }
+        )
+        posted = True
+        if response.status_code == 200 and http_conf['success_marker'].lower() in response.text.lower():
+            lead_id_match = re.search(http_conf['lead_id_pattern'], response.text)
+            if lead_id_match:
+                lead_id = lead_id_match.group(1)
+                logger.info(f"HTTP fast-path submission confirmed. Lead ID: {lead_id}")
+                return (STATUS_SUCCESS, f"Form submitted via HTTP fast path with Lead ID: {lead_id}", lead_id), posted
+            logger.info("HTTP fast path saw the success marker but no lead ID; falling back to browser submission.")
+        else:
+            logger.info(
+                f"HTTP fast path not confirmed (status {response.status_code}); "
+                "falling back to browser submission."
+            )
+    except (http_client.exceptions.ProxyError, http_client.exceptions.ConnectTimeout) as e:
+        # The tunnel/connection was never established, so the POST provably
+        # did not reach the site; posted stays False.
+        logger.warning(f"HTTP fast-path connection failed before sending ({e}); falling back to browser submission.")
+    except http_client.RequestException as e:
+        # Resets and read timeouts may have happened after the request went
+        # out; assume it was delivered so the gate is never double-spent.
+        posted = True
+        logger.warning(f"HTTP fast-path submission failed ({e}); falling back to browser submission.")
+    return None, posted
+
+async def submit_to_external_form_pw_async(prospect_data, target_site_key, dynamic_proxy_details=None, browser=None, submit_gate=None):
     """
     Submits prospect data using Playwright to the specified target site.
+
+    Async all the way down: while one submission sits in page.goto or a
+    wait_for_* call (which is most of its lifetime), the event loop is free
+    to drive every other in-flight submission. When the caller already holds
+    a browser, pass it in and the attempt only pays for a fresh
+    BrowserContext (~tens of ms) with the proxy attached per-context.
+    Otherwise a browser is borrowed from the process-wide pool for the
+    duration of this one submission.
     Args:
         prospect_data (dict): Contains 'full_name', 'phone', 'zip'.
         target_site_key (str): The key identifying the target site (e.g., 'elderlyhealth').
         dynamic_proxy_details (dict): Proxy config or None.
+        browser (Browser): Optional existing browser handle to reuse.
+        submit_gate (_SubmitGate): Optional gate shared by parallel attempts
+            for the same inbound lead; only its holder may submit.
     Returns:
         tuple: (status_code, message_string, captured_lead_id or None)
     """
+    try:
+        if HTTP_SUBMIT_ENABLED and _http_submit_usable(target_site_key):
+            # The POST IS the submission (no cancellation point once sent),
+            # so it may only run while holding the gate.
+            if submit_gate is None or submit_gate.try_claim():
+                # The POST blocks, so run it off-loop; the event loop keeps
+                # driving the other in-flight submissions meanwhile.
+                http_result, posted = await asyncio.to_thread(
+                    submit_to_external_form_http, prospect_data, target_site_key, dynamic_proxy_details
+                )
+                if http_result is not None:
+                    return http_result
+                if not posted and submit_gate is not None:
+                    # Nothing left the process, so holding the claim would
+                    # only freeze out the other attempts; rejoin the race
+                    # at the browser stage on equal footing.
+                    submit_gate.release()
+        if browser is not None:
+            return await _submit_with_browser(browser, prospect_data, target_site_key, dynamic_proxy_details, submit_gate=submit_gate)
+
+        # --- Batch coalescing ---
+        # If a submission for the same site and proxy exit is already warming
+        # up, ride along in its BrowserContext instead of opening our own.
+        batch_key = (target_site_key, (dynamic_proxy_details or {}).get('user'))
+        batch = _pending_batches.get(batch_key)
+        if batch is not None and batch.join():
+            try:
+                shared_context = await batch.context_ready
+                if shared_context is not None:
+                    logger.info(f"Joining in-flight submission batch for site '{target_site_key}'.")
+                    return await _submit_with_browser(
+                        None, prospect_data, target_site_key, dynamic_proxy_details,
+                        shared_context=shared_context, submit_gate=submit_gate
+                    )
+            finally:
+                batch.leave()
+            # The leader's context never materialized; lead a fresh batch.
+
+        batch = _SubmissionBatch()
+        _pending_batches[batch_key] = batch
+        try:
+            async with _borrow_browser() as own_browser:
+                try:
+                    return await _submit_with_browser(
+                        own_browser, prospect_data, target_site_key, dynamic_proxy_details,
+                        batch=batch, submit_gate=submit_gate
+                    )
+                finally:
+                    # Drain joiners and close the shared context BEFORE the
+                    # browser goes back to the pool: once returned it can be
+                    # borrowed, judged unhealthy, and closed out from under
+                    # any page still open on this context.
+                    if _pending_batches.get(batch_key) is batch:
+                        del _pending_batches[batch_key]
+                    await batch.finish()
+        finally:
+            # Only reached with work left when borrowing the browser itself
+            # failed; wake any joiners so they lead their own batch.
+            if _pending_batches.get(batch_key) is batch:
+                del _pending_batches[batch_key]
+            await batch.finish()
+    except Exception as e:
+        # Browser acquisition itself failed (pool exhausted, launch error, ...)
+        logger.error(f"Could not obtain a browser for submission: {e}", exc_info=True)
+        return STATUS_UNKNOWN_FAIL, f"Unexpected error: {e}", None
+
+def submit_to_external_form_pw(prospect_data, target_site_key, dynamic_proxy_details=None):
+    """
+    Sync facade over submit_to_external_form_pw_async for callers outside
+    the event loop; posts the coroutine to the pool loop and blocks.
+    """
+    return browser_pool.run(
+        submit_to_external_form_pw_async(prospect_data, target_site_key, dynamic_proxy_details),
+        timeout=300
+    )
+
+async def _submit_with_browser(browser, prospect_data, target_site_key, dynamic_proxy_details=None, shared_context=None, batch=None, submit_gate=None):
+    """
+    Runs one full form submission on an existing browser. Creates its own
+    BrowserContext unless shared_context is given, in which case it only
+    opens (and closes) a page on the batch's context. A freshly created
+    context is closed here -- except when it was published to a batch, whose
+    leader closes it after the joiners drain. Never closes the browser,
+    which belongs to the caller / the pool.
+    """
     # --- Get site config based on key ---
     if target_site_key not in SITE_CONFIG:
         logger.error(f"Invalid target_site_key passed: {target_site_key}")
@@ -254,316 +904,254 @@ def submit_to_external_form_pw(prospect_data, target_site_key, dynamic_proxy_det
     logger.info(f"Targeting site '{target_site_key}' at URL: {target_url}")
 
     # --- Initialize variables ---
-    browser = None
     context = None
     page = None
     lead_id = None # Initialize lead_id here
 
+    # --- 1. Configure Proxy (applied per-context, not per-launch) ---
+    proxy_options = None
+    if dynamic_proxy_details:
+        proxy_options = {
+            'server': f"http://{dynamic_proxy_details['host']}:{dynamic_proxy_details['port']}",
+            'username': dynamic_proxy_details['user'],
+            'password': dynamic_proxy_details['pass']
+        }
+        logger.info(f"Attempting connection via proxy: {proxy_options['server']} User: {proxy_options['username']}")
+    else:
+        logger.info("Attempting connection without proxy.")
+
     # --- Main Try Block ---
-    try: # <-- Start of main try block (Level 1 Indent)
-        with sync_playwright() as p:
-            # --- 1. Configure Proxy ---
-            proxy_options = None
-            if dynamic_proxy_details:
-                proxy_options = {
-                    'server': f"http://{dynamic_proxy_details['host']}:{dynamic_proxy_details['port']}",
-                    'username': dynamic_proxy_details['user'],
-                    'password': dynamic_proxy_details['pass']
-                }
-                logger.info(f"Attempting connection via proxy: {proxy_options['server']} User: {proxy_options['username']}")
+    try:
+        # --- 3. Create Context and Page ---
+        try:
+            if shared_context is not None:
+                page = await shared_context.new_page()
+                await page.route("**/*", _block_nonessential_requests)
+                logger.info("Page created on shared batch context.")
             else:
-                logger.info("Attempting connection without proxy.")
-
-            # Launch browser with retry logic
-            max_retries = 3
-            retry_count = 0
-            last_error = None
-            
-            while retry_count < max_retries:
-                try:
-                    # Try launching with default args first
-                    browser_launch_args = {
-                        'headless': False,
-                        'args': [
-                            '--no-sandbox',
-                            '--disable-setuid-sandbox',
-                            '--disable-dev-shm-usage',
-                            '--disable-gpu'
-                        ]
-                    }
-                    
-                    if dynamic_proxy_details:
-                        # Format proxy URL with http:// prefix for Playwright
-                        proxy_url = f"http://{dynamic_proxy_details['user']}:{dynamic_proxy_details['pass']}@{dynamic_proxy_details['host']}:{dynamic_proxy_details['port']}"
-                        browser_launch_args['proxy'] = {
-                            'server': proxy_url
-                        }
-                        
-                    browser = p.chromium.launch(**browser_launch_args)
-                    break
-                except Exception as e:
-                    retry_count += 1
-                    last_error = str(e)
-                    logger.error(f"Browser launch attempt {retry_count} failed: {last_error}")
-                    
-                    if "executable doesn't exist" in last_error.lower():
-                        logger.info("Browser executable not found. Attempting to install...")
-                        try:
-                            import subprocess
-                            subprocess.run(["playwright", "install", "chromium", "--with-deps"], check=True)
-                            logger.info("Browser installed. Retrying...")
-                            continue
-                        except Exception as install_error:
-                            logger.error(f"Failed to install browser: {str(install_error)}")
-                    
-                    if retry_count == max_retries:
-                        if "EPIPE" in last_error:
-                            return STATUS_PROXY_CONNECT_FAIL, "Proxy connection failed - broken pipe", None
-                        elif "ERR_PROXY_CONNECTION_FAILED" in last_error:
-                            return STATUS_PROXY_CONNECT_FAIL, "Proxy connection failed", None
-                        elif "timeout" in last_error.lower():
-                            return STATUS_PROXY_CONNECT_FAIL, "Proxy connection timeout", None
-                        elif "executable doesn't exist" in last_error.lower():
-                            return STATUS_UNKNOWN_FAIL, "Browser executable not found", None
-                        else:
-                            return STATUS_UNKNOWN_FAIL, f"Browser launch failed: {last_error}", None
-                    
-                    time.sleep(2)  # Wait before retrying
-
-            # --- 2. Launch Browser ---
-            try: # Level 3 Indent
-                # Try launching with default args first
-                browser_launch_args = {
-                    'headless': False,
-                    'args': [
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu'
-                    ]
+                context_kwargs = {
+                    'user_agent': _USER_AGENT,
+                    'viewport': {'width': 1280, 'height': 720}
                 }
-
+                warm_state = _fresh_storage_state(target_site_key)
+                if warm_state:
+                    # Seed cookies/localStorage from the latest warm-up so
+                    # the page skips its first-visit JS bootstrapping.
+                    context_kwargs['storage_state'] = warm_state
                 if proxy_options:
-                    browser_launch_args['proxy'] = proxy_options
-
-                browser = p.chromium.launch(**browser_launch_args)
-                logger.info("Browser launched successfully (non-headless).")
-
-            except PlaywrightError as launch_err:
-                logger.error(f"Browser launch failed: {launch_err}")
-                err_str = str(launch_err).lower()
-                if "protocol error" in err_str or "browser has disconnected" in err_str or "cannot connect" in err_str:
-                     return STATUS_AUTOMATION_FAIL, f"Non-headless launch failed (check environment/Xvfb): {launch_err}", None
-                elif "proxy" in err_str or "tunnel" in err_str or "epipe" in err_str or "timeout" in err_str:
-                     return STATUS_PROXY_CONNECT_FAIL, f"Proxy launch failed: {launch_err}", None
-                else:
-                     return STATUS_UNKNOWN_FAIL, f"Browser launch failed: {launch_err}", None
-
-            # --- 3. Create Context and Page ---
-            try: # Level 3 Indent
-                context = browser.new_context(
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    viewport={'width': 1280, 'height': 720}
-                )
-                page = context.new_page()
-                logger.info("Browser context and page created.")
-            except PlaywrightError as context_err:
-                 logger.error(f"Failed to create browser context/page: {context_err}")
-                 if browser:
-                     try: browser.close()
-                     except: pass
-                 return STATUS_AUTOMATION_FAIL, f"Context creation failed: {context_err}", None
-
-            # --- 4. Verify Proxy (Optional but Recommended) ---
-            if proxy_options:
-                try:
-                    logger.info("Verifying proxy connection via ipify.org...")
-                    page.goto('https://api.ipify.org/', timeout=30000)
-                    ip_address = page.locator('pre').text_content(timeout=5000)
-                    logger.info(f"Proxy verification successful. IP: {ip_address}")
-                except PlaywrightError as verify_err:
-                    logger.error(f"Proxy verification failed: {verify_err}")
-                    err_str = str(verify_err).lower()
-                    if "proxy" in err_str or "tunnel" in err_str or "epipe" in err_str or "timeout" in err_str:
-                        return STATUS_PROXY_CONNECT_FAIL, f"Proxy verification failed: {verify_err}", None
-                    else:
-                        return STATUS_NAVIGATION_FAIL, f"Proxy verification navigation failed: {verify_err}", None
-                # Removed general exception catch here
-
-            # --- 5. Navigate to Target Form ---
+                    # Playwright supports per-context proxies, so the pooled
+                    # browser never has to be relaunched for a new zip.
+                    context_kwargs['proxy'] = proxy_options
+                context = await browser.new_context(**context_kwargs)
+                if batch is not None:
+                    batch.publish(context)
+                page = await context.new_page()
+                # Short-circuit non-essential subresources before they ever leave
+                # the proxy; the form and its lead-id scripts still load normally.
+                await page.route("**/*", _block_nonessential_requests)
+                logger.info("Browser context and page created (non-essential requests blocked).")
+        except PlaywrightError as context_err:
+             logger.error(f"Failed to create browser context/page: {context_err}")
+             return STATUS_AUTOMATION_FAIL, f"Context creation failed: {context_err}", None
+
+        # --- 4. Verify Proxy (opt-in, once per proxy user per TTL) ---
+        # Joiners always skip this: the shared context's tunnel was verified
+        # by the batch leader.
+        if proxy_options and shared_context is None and _should_verify_proxy(proxy_options['username']):
             try:
-                logger.info(f"Navigating to target page: {target_url}...")
-                page.goto(target_url, wait_until='domcontentloaded', timeout=60000)
-                logger.info("DOM loaded. Waiting for page load event...")
-                page.wait_for_load_state('load', timeout=30000)
-                logger.info("Load event fired.")
+                logger.info("Verifying proxy connection via ipify.org...")
+                await page.goto('https://api.ipify.org/', timeout=30000)
+                ip_address = await page.locator('pre').text_content(timeout=5000)
+                logger.info(f"Proxy verification successful. IP: {ip_address}")
+                _proxy_verified_cache[proxy_options['username']] = time.monotonic()
+            except PlaywrightError as verify_err:
+                logger.error(f"Proxy verification failed: {verify_err}")
+                status = _classify_playwright_error(verify_err)
+                if status == STATUS_PROXY_CONNECT_FAIL:
+                    return status, f"Proxy verification failed: {verify_err}", None
+                return status, f"Proxy verification navigation failed: {verify_err}", None
+            # Removed general exception catch here
+
+        # --- 5. Navigate to Target Form ---
+        try:
+            logger.info(f"Navigating to target page: {target_url}...")
+            await page.goto(target_url, wait_until='domcontentloaded', timeout=60000)
+            logger.info("DOM loaded.")
+            # No 'load'/'networkidle' waits here: ad-heavy pages keep the
+            # network busy long after the form is interactive, and the next
+            # step waits for the form elements themselves.
+
+        except (PlaywrightError, Exception) as nav_err:
+            logger.error(f"Navigation to {target_url} failed: {nav_err}")
+            # With verification off by default, the form navigation is where
+            # a dead proxy tunnel first shows up; classify it as such so the
+            # retry loop moves on to the next zip instead of aborting.
+            status = _classify_playwright_error(nav_err) if proxy_options else STATUS_NAVIGATION_FAIL
+            return status, f"Navigation failed: {nav_err}", None
+
+        # --- 6. Wait for Essential Form Elements --- (USING DYNAMIC SELECTORS)
+        try:
+            logger.info("Waiting for essential form elements to be ready...")
+            # Wait for a key element like the submit button using the site-specific selector
+            await page.locator(selectors['submit_button']).wait_for(state='visible', timeout=20000) # Increased timeout
+            logger.info("Form elements seem ready.")
+        except PlaywrightTimeoutError as wait_err:
+             logger.error(f"Timed out waiting for essential form elements: {wait_err}")
+             try: await page.screenshot(path='form_elements_timeout.png') # Screenshot on failure
+             except: pass
+             return STATUS_AUTOMATION_FAIL, f"Page did not load required form elements: {wait_err}", None
+
+        # --- Submit gate: at most one external submission per lead ---
+        # Everything up to here (context, proxy connect, navigation) is a
+        # read-only probe and safe to run in parallel; filling and clicking
+        # submit is not. Only the first attempt with a ready form proceeds.
+        if submit_gate is not None and not submit_gate.try_claim():
+            logger.info("Another attempt already claimed this lead's submission; standing down.")
+            return STATUS_SKIPPED, "Another parallel attempt claimed the submission.", None
+
+        # --- 7. Fill Form, Check Consent, Extract Lead ID (single evaluate) ---
+        lead_id = None # Initialize before try
+        try:
+            logger.info(f"Filling form with data: {prospect_data['full_name']}, {prospect_data['phone']}, {prospect_data['zip']}")
+            fill_result = await page.evaluate(
+                _FILL_FORM_JS,
+                {'selectors': selectors, 'data': prospect_data}
+            )
+            if not fill_result['filled']:
+                logger.error("One or more form fields were not found on the page.")
+                return STATUS_AUTOMATION_FAIL, "Failed to fill form field: element not found", None
+            if not fill_result['consentChecked']:
+                logger.warning(f"Consent box ({selectors['consent']}) not found or not checked.")
+                # Decide if this is critical. For now, we warn and continue.
+            lead_id = fill_result['leadId'] or None
+            if lead_id:
+                logger.info(f"Form filled; Lead ID extracted: {lead_id}")
+            else:
+                # Jornaya populates universal_leadid asynchronously, so an
+                # empty value this early is normal; it is re-read just
+                # before the submit click below.
+                logger.info("Form filled; Lead ID not populated yet.")
+        except PlaywrightError as fill_err:
+             logger.error(f"Failed to fill form via page.evaluate: {fill_err}")
+             return STATUS_AUTOMATION_FAIL, f"Failed to fill form field: {fill_err}", None
+
+        # --- 8. Click Submit Button --- (USING DYNAMIC SELECTOR)
+        try:
+            logger.info("Attempting to click submit button...")
+            submit_button = page.locator(selectors['submit_button'])
+            if not await submit_button.is_visible():
+                logger.warning("Submit button not immediately visible, waiting...")
+                await submit_button.wait_for(state='visible', timeout=10000)
+
+            if not await submit_button.is_enabled():
+                logger.warning("Submit button not enabled, waiting...")
+                # Wait for button to potentially become enabled (adjust timeout as needed)
+                # This is tricky, maybe a specific condition is better if known
                 try:
-                    # Increase network idle timeout, but don't fail immediately if it times out
-                    page.wait_for_load_state('networkidle', timeout=45000)
-                    logger.info("Network is idle.")
+                    await page.wait_for_function("() => document.querySelector('{}').disabled === false".format(selectors['submit_button']), timeout=5000)
                 except PlaywrightTimeoutError:
-                    logger.warning("Timed out waiting for network idle. Proceeding anyway...")
-                logger.info("Navigation and waits complete.")
-            except (PlaywrightError, Exception) as nav_err:
-                logger.error(f"Navigation to {target_url} failed: {nav_err}")
-                # Determine if it's proxy or navigation fail based on context if possible
-                return STATUS_NAVIGATION_FAIL, f"Navigation failed: {nav_err}", None
-
-            # --- 6. Wait for Essential Form Elements --- (USING DYNAMIC SELECTORS)
-            try:
-                logger.info("Waiting for essential form elements to be ready...")
-                # Wait for a key element like the submit button using the site-specific selector
-                page.locator(selectors['submit_button']).wait_for(state='visible', timeout=20000) # Increased timeout
-                logger.info("Form elements seem ready.")
-            except PlaywrightTimeoutError as wait_err:
-                 logger.error(f"Timed out waiting for essential form elements: {wait_err}")
-                 try: page.screenshot(path='form_elements_timeout.png') # Screenshot on failure
-                 except: pass
-                 return STATUS_AUTOMATION_FAIL, f"Page did not load required form elements: {wait_err}", None
-
-            # --- 7. Extract Lead ID (USING DYNAMIC SELECTOR) ---
-            try:
-                logger.info("Confirming lead ID field exists...")
-                page.locator(selectors['lead_id_field']).wait_for(state='attached', timeout=5000) # Just check existence
-                logger.info("Lead ID input field found.")
-            except PlaywrightTimeoutError as lead_wait_err:
-                 logger.warning(f"Could not find Lead ID field ({selectors['lead_id_field']}) within timeout: {lead_wait_err}")
-                 # Don't fail here, maybe it appears later or isn't needed
-                 pass # Continue without failing
-
-            # --- 8. Fill Form --- (USING DYNAMIC SELECTORS)
+                    logger.error("Submit button did not become enabled.")
+                    raise Exception("Submit button did not become enabled.")
+
+            # --- Re-read Lead ID (Immediately Before Submit) ---
+            # The consent click triggers Jornaya's async lead-id generation;
+            # by now (after the visibility/enabled waits) the field has had
+            # time to fill in. One extra round-trip here is what keeps the
+            # ID capture reliable.
             try:
-                logger.info(f"Filling form with data: {prospect_data['full_name']}, {prospect_data['phone']}, {prospect_data['zip']}")
-                page.locator(selectors['full_name']).fill(prospect_data['full_name'])
-                page.locator(selectors['phone']).fill(prospect_data['phone'])
-                page.locator(selectors['zip']).fill(prospect_data['zip'])
-                logger.info("Form fields filled.")
-            except PlaywrightError as fill_err:
-                 logger.error(f"Failed to fill form field: {fill_err}")
-                 return STATUS_AUTOMATION_FAIL, f"Failed to fill form field: {fill_err}", None
-
-            # --- 9. Check Consent Box --- (USING DYNAMIC SELECTOR)
-            try:
-                logger.info("Checking consent box...")
-                consent_locator = page.locator(selectors['consent'])
-                consent_locator.wait_for(state='visible', timeout=5000)
-                consent_locator.check()
-                logger.info("Consent box checked.")
-            except PlaywrightTimeoutError:
-                 logger.warning(f"Consent box ({selectors['consent']}) not found or visible within timeout.")
-                 # Decide if this is critical. For now, we warn and continue.
-                 pass
-            except PlaywrightError as consent_err:
-                 logger.error(f"Failed to check consent box: {consent_err}")
-                 return STATUS_AUTOMATION_FAIL, f"Failed to check consent box: {consent_err}", None
-
-            # --- 10. Extract Lead ID (Immediately Before Submit) --- (USING DYNAMIC SELECTOR)
-            lead_id = None # Initialize before try
-            try:
-                logger.info("Extracting final Lead ID just before submit...")
                 lead_id_locator = page.locator(selectors['lead_id_field'])
-                if lead_id_locator.count() > 0:
-                     lead_id = lead_id_locator.input_value(timeout=5000)
-                     if lead_id:
-                         logger.info(f"Lead ID extracted just before submit: {lead_id}")
-                     else:
-                         logger.warning("Lead ID field found but value is empty.")
+                if await lead_id_locator.count() > 0:
+                    lead_id = await lead_id_locator.input_value(timeout=5000) or lead_id
+                if lead_id:
+                    logger.info(f"Lead ID just before submit: {lead_id}")
                 else:
-                    logger.warning("Lead ID field not present when trying to read value.")
+                    logger.warning("Lead ID field still empty just before submit.")
             except PlaywrightError as lead_err:
-                 logger.error(f"Could not extract Lead ID before submit: {lead_err}")
-                 # Don't fail here, just log it. lead_id remains None.
+                logger.warning(f"Could not re-read Lead ID before submit: {lead_err}")
 
-            # --- 11. Click Submit Button --- (USING DYNAMIC SELECTOR)
+            # The thank-you modal exists in the DOM from initial load; if it
+            # already reads as visible (broken/missing CSS), seeing it after
+            # the click proves nothing.
             try:
-                logger.info("Attempting to click submit button...")
-                submit_button = page.locator(selectors['submit_button'])
-                if not submit_button.is_visible():
-                    logger.warning("Submit button not immediately visible, waiting...")
-                    submit_button.wait_for(state='visible', timeout=10000)
-
-                if not submit_button.is_enabled():
-                    logger.warning("Submit button not enabled, waiting...")
-                    # Wait for button to potentially become enabled (adjust timeout as needed)
-                    # This is tricky, maybe a specific condition is better if known
-                    try:
-                        page.wait_for_function("() => document.querySelector('{}').disabled === false".format(selectors['submit_button']), timeout=5000)
-                    except PlaywrightTimeoutError:
-                        logger.error("Submit button did not become enabled.")
-                        raise Exception("Submit button did not become enabled.")
-
-                logger.info("Waiting for 1 second before clicking submit...") # Small delay
-                time.sleep(1)
-
-                logger.info("Executing click action on submit button...")
-                submit_button.click()
-                logger.info("Submit button clicked successfully.")
-
-                # --- SUCCESS Condition --- 
-                # If click succeeded AND we have a lead_id, consider it successful immediately.
-                if lead_id:
-                    logger.info(f"Form submission considered successful with Lead ID: {lead_id}")
-                    return STATUS_SUCCESS, f"Form submitted successfully with Lead ID: {lead_id}", lead_id
-                else:
-                    # This case shouldn't happen if lead ID extraction is mandatory, but as a fallback:
-                    logger.warning("Submit clicked, but no Lead ID was captured earlier.")
-                    return STATUS_SUCCESS, "Form submitted, but Lead ID was not captured.", None
-
-            except PlaywrightTimeoutError as submit_timeout_err:
-                logger.error(f"Timeout interacting with submit button: {submit_timeout_err}")
-                return STATUS_AUTOMATION_FAIL, f"Timeout clicking submit: {submit_timeout_err}", lead_id # Return ID if captured
-            except Exception as general_submit_err:
-                 # Catch any other errors during submit interaction
-                 logger.error(f"An unexpected error occurred clicking submit: {general_submit_err}")
-                 return STATUS_UNKNOWN_FAIL, f"Unexpected Submit Click error: {general_submit_err}", lead_id # Return ID if captured
-
-            # Wait for submission to complete
+                indicator_visible_before = await page.locator(selectors['success_indicator']).first.is_visible()
+            except PlaywrightError:
+                indicator_visible_before = False
+            if indicator_visible_before:
+                logger.warning("Success indicator already visible BEFORE submit; it cannot confirm this submission.")
+
+            logger.info("Executing click action on submit button...")
+            await submit_button.click()
+            logger.info("Submit button clicked successfully.")
+
+        except PlaywrightTimeoutError as submit_timeout_err:
+            logger.error(f"Timeout interacting with submit button: {submit_timeout_err}")
+            return STATUS_AUTOMATION_FAIL, f"Timeout clicking submit: {submit_timeout_err}", lead_id # Return ID if captured
+        except Exception as general_submit_err:
+             # Catch any other errors during submit interaction
+             logger.error(f"An unexpected error occurred clicking submit: {general_submit_err}")
+             return STATUS_UNKNOWN_FAIL, f"Unexpected Submit Click error: {general_submit_err}", lead_id # Return ID if captured
+
+        # --- 9. Confirm Submission --- (USING DYNAMIC SELECTOR)
+        # Wait for the site's thank-you indicator rather than 'networkidle';
+        # the confirmation element appears seconds before the ad/analytics
+        # traffic quiets down (when it ever does). If the indicator was
+        # already visible before the click, it is discounted entirely and
+        # only a captured lead ID can vouch for the submission.
+        indicator_confirmed = False
+        if not indicator_visible_before:
             try:
-                page.wait_for_load_state('networkidle', timeout=30000)
-                logger.info("Page loaded after submission")
-            except PlaywrightError as e:
-                error_msg = str(e)
-                logger.error(f"Failed to wait for submission completion: {error_msg}")
-                return STATUS_AUTOMATION_FAIL, f"Submission completion wait failed: {error_msg}", None
-            
-            # Check for success - we consider it successful if we:
-            # 1. Successfully submitted the form
-            # 2. Have a valid lead ID
-            # 3. The page loaded after submission
+                await page.wait_for_selector(selectors['success_indicator'], timeout=15000)
+                logger.info("Success indicator found after submission.")
+                indicator_confirmed = True
+            except PlaywrightTimeoutError:
+                pass
+            except PlaywrightError as confirm_err:
+                logger.error(f"Failed waiting for submission confirmation: {confirm_err}")
+                return STATUS_AUTOMATION_FAIL, f"Submission confirmation wait failed: {confirm_err}", lead_id
+        if not indicator_confirmed:
             if lead_id:
-                logger.info(f"Form submission considered successful with Lead ID: {lead_id}")
-                return STATUS_SUCCESS, f"Form submitted successfully with Lead ID: {lead_id}", lead_id
-            
-            # If no lead ID but we got this far, still consider it potentially successful
-            logger.info("Form submission likely successful but no lead ID found")
-            return STATUS_SUCCESS, "Form likely submitted successfully but no lead ID found", None
+                # Soft success: the click went through and we hold a lead ID,
+                # the confirmation modal just didn't (credibly) render.
+                logger.warning("No usable success indicator, but Lead ID was captured. Treating as success.")
+            else:
+                logger.error("No usable success indicator and no Lead ID captured.")
+                return STATUS_AUTOMATION_FAIL, "No submission confirmation and no Lead ID captured.", None
 
-        # --- End of 'with sync_playwright()' block ---
+        if lead_id:
+            logger.info(f"Form submission considered successful with Lead ID: {lead_id}")
+            return STATUS_SUCCESS, f"Form submitted successfully with Lead ID: {lead_id}", lead_id
 
-    except Exception as e: # <-- Start of main outer EXCEPT block (Level 1 Indent)
+        # If no lead ID but we got this far, still consider it potentially successful
+        logger.info("Form submission successful but no lead ID found")
+        return STATUS_SUCCESS, "Form submitted, but Lead ID was not captured.", None
+
+    except Exception as e:
         # Catch any unexpected errors not caught by specific PlaywrightError handlers above
         logger.error(f"An unexpected error occurred in Playwright function: {e}", exc_info=True)
         # Ensure lead_id is returned if it was captured before the error
         return STATUS_UNKNOWN_FAIL, f"Unexpected error: {e}", lead_id
 
-    finally: # <-- FINALLY block associated with main outer TRY (Level 1 Indent)
-        # Ensure browser resources are closed even if errors occurred (outside the 'with' block, unlikely needed)
-        if context:
-            try:
-                context.close()
-                logger.info("Playwright context closed in finally.")
-            except Exception as e:
-                logger.error(f"Error closing context in finally: {e}")
-        if browser:
+    finally:
+        if shared_context is not None:
+            # Only our page belongs to us; the batch leader owns the context.
+            if page:
+                try:
+                    await page.close()
+                except Exception as close_err:
+                    logger.error(f"Error closing page on shared context: {close_err}")
+        elif batch is not None:
+            # Published to a batch; the leader closes it after joiners drain.
+            pass
+        elif context:
+            # Close the per-submission context; the browser stays warm for
+            # the next attempt.
             try:
-                browser.close()
-                logger.info("Playwright browser closed in finally.")
-            except Exception as e:
-                logger.error(f"Error closing browser in finally: {e}")
-        logger.info("Playwright browser resources cleanup attempted in finally.")
-    # --- End of function ---
+                await context.close()
+                logger.info("Playwright context closed.")
+            except Exception as close_err:
+                logger.error(f"Error closing context: {close_err}")
 
-def submit_fallback_test_mode(prospect_data, dynamic_proxy_details=None):
+def submit_fallback_test_mode(prospect_data, target_site_key=None, dynamic_proxy_details=None, browser=None):
     """
     Fallback function for testing when Playwright browser isn't available.
     This simulates a successful form submission for testing purposes.
@@ -871,136 +1459,169 @@ def legacy_index():
         logger.warning("TEST MODE ENABLED - Using simulated form submission")
         flash("TEST MODE ACTIVE: This is a simulated submission for testing", 'warning')
 
-# --- Initialize retry logic variables ---
-    max_retries = 5
-    zip_codes_to_try = [zip_code] # Start with the original zip
-    tried_zip_codes = set()
-    radius = 5 # Initial search radius in miles
+    # --- Build the candidate zip queue up front ---
+    # One wide-radius lookup, sorted by distance, replaces the old
+    # expanding-radius search that re-queried SQLite (and re-resolved the
+    # target's coordinates) on every failed attempt. The queue holds the
+    # original zip plus enough neighbors for a second wave of attempts.
+    max_parallel_attempts = 5
+    candidate_zips = collections.deque([zip_code])
+    if PROXY_CONFIGURED and (zip_search_index or search):
+        for z in get_nearby_zip_codes(zip_code, radius_miles=25, max_results=max_parallel_attempts * 2):
+            if z not in candidate_zips:
+                candidate_zips.append(z)
+    logger.info(f"Candidate zip codes for submission (nearest first): {list(candidate_zips)}")
+
     final_status = None
-    # Default failure message if loop finishes without success or specific error
-    final_message = f"Failed after {max_retries} attempts. Could not complete submission."
+    # Default failure message if no attempt produces something more specific
+    final_message = f"Failed after trying {len(candidate_zips)} zip code(s). Could not complete submission."
     final_lead_id = None
+    used_zip = None
+    proxy_fail_message = None
+    other_fail_message = None
+    # Shared by every attempt for this lead: the waves only race the proxy
+    # stage, and exactly one attempt is allowed to submit the form.
+    submit_gate = _SubmitGate()
+
+    def proxy_details_for(current_zip):
+        """Builds the DataImpulse proxy config for one zip, or None without proxy."""
+        if not PROXY_CONFIGURED:
+            logger.warning(f"Attempting without proxy for zip {current_zip} as proxy is not configured.")
+            return None
+        # Construct the dynamic username string for DataImpulse
+        # Ensure PROXY_BASE_USER includes static parts like country code if needed
+        dynamic_proxy_user = f"{PROXY_BASE_USER};zip.{current_zip}"
+        # Log censored details for security
+        logger.info(f"Using proxy configuration: {dynamic_proxy_user}:********@{PROXY_HOST}:{PROXY_PORT}")
+        return {
+            'host': PROXY_HOST,
+            'port': PROXY_PORT,
+            'user': dynamic_proxy_user,
+            'pass': PROXY_PASS
+        }
 
-    # --- Retry Loop ---
-    for attempt in range(max_retries): # Level 1 Indent (Inside function)
-
-        # --- Get next zip code from the list --- Level 2 Indent
-        if not zip_codes_to_try:
-            # If the list is empty, stop retrying
-            if attempt > 0: # Only log if it's not the very first check
-                 logger.warning("No more zip codes left in the queue to try.")
-                 # Keep the last failure message if available, otherwise set a generic one
-                 final_message = final_message or f"Failed after {attempt} attempts. No suitable proxy found for previously searched nearby zip codes."
-            else: # Failed first attempt and found no neighbors immediately
-                 # Keep the specific failure message from the first attempt if available
-                 final_message = final_message or f"Initial proxy attempt failed for zip {zip_code} and no nearby zips found in radius {radius}."
-            break # Exit loop if no zips left in queue
-
-        current_zip = zip_codes_to_try.pop(0) # Get the next zip to try
-        if current_zip in tried_zip_codes:
-            logger.info(f"Skipping already tried zip code: {current_zip}")
-            continue # Go to next attempt iteration
-
-        tried_zip_codes.add(current_zip)
-        logger.info(f"--- Attempt {attempt + 1}/{max_retries} --- Trying Zip Code: {current_zip} ---") # Log current attempt
-
-        # --- Prepare proxy details for this specific attempt --- Level 2 Indent
-        dynamic_proxy_details = None
-        if PROXY_CONFIGURED:
-            # Construct the dynamic username string for DataImpulse
-            # Ensure PROXY_BASE_USER includes static parts like country code if needed
-            dynamic_proxy_user = f"{PROXY_BASE_USER};zip.{current_zip}"
-            dynamic_proxy_details = {
-                'host': PROXY_HOST,
-                'port': PROXY_PORT,
-                'user': dynamic_proxy_user,
-                'pass': PROXY_PASS
-            }
-            # Log censored details for security
-            logger.info(f"Using proxy configuration: {dynamic_proxy_user}:********@{PROXY_HOST}:{PROXY_PORT}")
+    async def attempt_zip_async(current_zip):
+        """
+        Runs one submission attempt as a task on the pool's event loop.
+        Each attempt borrows its own browser from the pool.
+        """
+        logger.info(f"--- Trying Zip Code: {current_zip} (URL {target_url}) ---")
+        if TEST_MODE:
+            # The simulated submission is plain sync code; run it inline.
+            # It still honors the gate so test mode mirrors production's
+            # one-submission-per-lead behaviour.
+            if not submit_gate.try_claim():
+                return current_zip, STATUS_SKIPPED, "Another parallel attempt claimed the submission.", None
+            status, message, lead_id = submission_function(prospect_data, target_site, proxy_details_for(current_zip))
         else:
-            logger.warning(f"Attempting without proxy for zip {current_zip} as proxy is not configured.") # Log if running without proxy
-
-        # --- Call the Playwright submission function --- Level 2 Indent
-        try: # Level 2 Indent
-            logger.info(f"Calling {submission_function.__name__} for zip {current_zip} to URL {target_url}...") # Log URL
-            # Pass the target_site KEY to the submission function
-            status, message, lead_id = submission_function(prospect_data, target_site, dynamic_proxy_details)
-            logger.info(f"Call finished for zip {current_zip}. Status: {status}, Message: {message}, LeadID: {lead_id}") # Log after calling
-
-            # Store results of this latest attempt
-            final_status, final_message, final_lead_id = status, message, lead_id
-
-            # --- Check status --- Level 3 Indent
-            if status == STATUS_SUCCESS:
-                logger.info(f"Submission SUCCEEDED on attempt {attempt + 1} with zip {current_zip}.")
-                # Use the success message from the function
-                flash(f"{final_message} (Used Zip: {current_zip}). Lead ID: {final_lead_id}", 'success')
-                break # Exit loop successfully
-
-            elif status == STATUS_PROXY_CONNECT_FAIL:
-                logger.warning(f"Attempt {attempt + 1} FAILED with zip {current_zip} due to PROXY_CONNECT_FAIL: {message}")
-                if attempt < max_retries - 1: # Check if more retries are allowed
-                    # Flash intermediate warning to user
-                    flash(f'Proxy connection failed for zip {current_zip}. Finding nearby zip codes (radius {radius} miles)...', 'warning')
-                    # Find nearby zip codes only if proxy failed and more retries left
-                    if search: # Check if search engine initialized successfully
-                        logger.info(f"Finding nearby zip codes for original zip {zip_code} (radius: {radius} miles)")
-                        nearby_zips = get_nearby_zip_codes(zip_code, radius_miles=radius, max_results=3) # Use corrected function call
-                        if nearby_zips:
-                            added_count = 0
-                            for z in nearby_zips:
-                                if z not in tried_zip_codes and z not in zip_codes_to_try:
-                                    zip_codes_to_try.append(z)
-                                    added_count += 1
-                            if added_count > 0:
-                                logger.info(f"Added {added_count} new nearby zip codes to try: {zip_codes_to_try}")
-                            else:
-                                logger.info("No *new* nearby zip codes found to add in this radius.")
-                        else:
-                           logger.info(f"No nearby zip codes found within {radius} miles.")
-                        # Increase radius for the *next* search attempt
-                        radius += 5
-                    else:
-                        logger.error("Cannot search for nearby zips, uszipcode search engine failed to initialize.")
-                        # Update final message and stop retrying if search fails
-                        final_message = "Proxy failed, cannot search for nearby zips (SearchEngine init failed)."
-                        break # Exit loop
-
-                else: # This was the Last attempt and it failed with proxy error
-                    final_message = f"Failed after {max_retries} attempts. Could not connect via proxy near zip {zip_code}. Last error for zip {current_zip}: {message}"
-                    logger.error(final_message)
-                    # Let loop end naturally, message flashed after loop
-                    break # Exit loop
-
-            else: # Handle Other Failures (NAVIGATION_FAIL, AUTOMATION_FAIL, UNKNOWN_FAIL)
-                logger.error(f"Attempt {attempt + 1} FAILED with zip {current_zip} due to {status}: {message}")
-                # Use the specific failure message from the function
-                final_message = f"Submission failed: {message} (Attempted zip: {current_zip})"
-                # Stop retrying, no point using different proxy if automation/navigation fails
-                break # Exit loop
-
-        except Exception as e: # Catch unexpected errors during the route's handling of the call or loop logic
-             logger.error(f"Critical error in submission loop (Attempt {attempt + 1}, Zip {current_zip}): {e}", exc_info=True)
-             final_status = STATUS_UNKNOWN_FAIL
-             final_message = f"An unexpected server error occurred during attempt {attempt + 1}."
-             # Ensure lead_id captured before error (if any) is kept
-             final_lead_id = lead_id if 'lead_id' in locals() else None
-             break # Exit loop
-
-    # --- After Loop --- (Level 1 Indent - Aligned with 'for')
-    # Flash the final outcome message IF it wasn't success
-    if final_status != STATUS_SUCCESS:
-         # Use the specific final_message determined within the loop
-         flash(final_message, 'error')
+            status, message, lead_id = await submit_to_external_form_pw_async(
+                prospect_data, target_site, proxy_details_for(current_zip), submit_gate=submit_gate
+            )
+        logger.info(f"Call finished for zip {current_zip}. Status: {status}, Message: {message}, LeadID: {lead_id}")
+        return current_zip, status, message, lead_id
+
+    async def run_wave_async(wave):
+        """Runs one wave of candidate zips concurrently; first success wins."""
+        nonlocal final_status, final_message, final_lead_id, used_zip
+        nonlocal proxy_fail_message, other_fail_message
+        tasks = [asyncio.ensure_future(attempt_zip_async(z)) for z in wave]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                try:
+                    current_zip, status, message, lead_id = await completed
+                except Exception as e:
+                    logger.error(f"Critical error in submission attempt: {e}", exc_info=True)
+                    other_fail_message = "An unexpected server error occurred during a submission attempt."
+                    continue
+
+                if status == STATUS_SKIPPED:
+                    # Stood down because another attempt claimed the lead;
+                    # says nothing about this zip's proxy, so record nothing.
+                    logger.info(f"Zip {current_zip} attempt stood down (submission already claimed).")
+                    continue
+
+                if status in (STATUS_SUCCESS, STATUS_PROXY_CONNECT_FAIL):
+                    record_zip_proxy_status(current_zip, status)
+
+                if status == STATUS_SUCCESS:
+                    logger.info(f"Submission SUCCEEDED with zip {current_zip}.")
+                    final_status, final_message, final_lead_id = status, message, lead_id
+                    used_zip = current_zip
+                    break # First success wins; remaining tasks get cancelled
+
+                elif status == STATUS_PROXY_CONNECT_FAIL:
+                    # Expected for zips without a proxy exit node; keep waiting
+                    # for the other candidates.
+                    logger.warning(f"Attempt FAILED with zip {current_zip} due to PROXY_CONNECT_FAIL: {message}")
+                    proxy_fail_message = f"Could not connect via proxy near zip {zip_code}. Last error for zip {current_zip}: {message}"
+
+                else: # NAVIGATION_FAIL, AUTOMATION_FAIL, UNKNOWN_FAIL
+                    logger.error(f"Attempt FAILED with zip {current_zip} due to {status}: {message}")
+                    other_fail_message = f"Submission failed: {message} (Attempted zip: {current_zip})"
+        finally:
+            # Cancel attempts still in flight; their finally blocks close any
+            # contexts they opened and release their browsers normally.
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # --- Fan out the attempts, one wave at a time ---
+    # Proxy connect failures cost a full handshake timeout each, so trying
+    # zips one after another means worst-case sum(timeouts). Each wave races
+    # up to max_parallel_attempts candidates through the proxy/navigation
+    # stage concurrently; the submit gate guarantees only one of them ever
+    # fills and submits the live form. If a whole wave only hit proxy
+    # failures, the next wave pops the remaining (farther) candidates from
+    # the pre-sorted queue.
+    while candidate_zips and final_status != STATUS_SUCCESS:
+        wave = []
+        while candidate_zips and len(wave) < max_parallel_attempts:
+            candidate = candidate_zips.popleft()
+            # Don't burn a slot (and a connect timeout) on a zip whose exit
+            # node failed within the last PROXY_ZIP_STATUS_TTL seconds.
+            if PROXY_CONFIGURED and zip_proxy_recently_failed(candidate):
+                logger.info(f"Skipping zip {candidate}: proxy connect failed recently.")
+                proxy_fail_message = proxy_fail_message or (
+                    f"Could not connect via proxy near zip {zip_code}. "
+                    f"Zip {candidate} failed recently and was skipped."
+                )
+                continue
+            wave.append(candidate)
+        if not wave:
+            break
+        logger.info(f"Submitting wave of {len(wave)} zip candidate(s): {wave}")
+        try:
+            browser_pool.run(run_wave_async(wave), timeout=300 * len(wave))
+        except Exception as e:
+            logger.error(f"Critical error running submission wave: {e}", exc_info=True)
+            other_fail_message = "An unexpected server error occurred during a submission attempt."
+
+        if other_fail_message:
+            # Automation/navigation failures won't be cured by a different
+            # proxy exit; don't burn the remaining candidates.
+            break
+
+    # --- After fan-out ---
+    if final_status == STATUS_SUCCESS:
+        flash(f"{final_message} (Used Zip: {used_zip}). Lead ID: {final_lead_id}", 'success')
+    else:
+        # Prefer the most telling failure: automation/navigation errors are
+        # more actionable than the (expected) proxy connect failures.
+        final_message = other_fail_message or proxy_fail_message or final_message
+        flash(final_message, 'error')
+
 
 # ... (logging the final outcome) ...
     logger.info(f"Final submission outcome for {full_name}: Status={final_status}, Message='{final_message}', LeadID='{final_lead_id}'")
     return render_template('form.html') # <-- ENSURE THIS LINE IS PRESENT AND CORRECTLY INDENTED
 # --- End of index() function ---
 
-# --- Run Flask App ---
+# --- Run App (via Gunicorn) ---
 if __name__ == '__main__':
-    # Get port from environment variable or use default
-    port = int(os.environ.get('PORT', 8080))
-    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
+    # The Werkzeug dev server handles one request at a time, so concurrent
+    # submissions would serialize behind Playwright's multi-second runtime.
+    # Run the real server (see gunicorn_conf.py) even when started as
+    # `python app.py`. The _BOOTSTRAPPING guards above kept this import
+    # free of browser processes, so the exec leaks nothing.
+    os.execvp('gunicorn', ['gunicorn', '-c', 'gunicorn_conf.py', 'wsgi:app'])
\ No newline at end of file
@@ -0,0 +1,201 @@
+import os
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# How many pre-warmed Chromium instances to keep alive per worker process.
+# Launching Chromium costs hundreds of ms to seconds and ~500 MB RSS peak,
+# so we pay that once per slot at startup instead of once per submission.
+MAX_WSE = int(os.environ.get('BROWSER_POOL_SIZE', '2'))
+
+# Base flags shared by every pooled Chromium instance. Proxy configuration is
+# deliberately NOT set here: submissions attach their proxy per-context via
+# browser.new_context(proxy=...), so one long-lived browser can serve any zip.
+#
+# Beyond the sandbox/GPU basics, the flags collapse DOM parsing and rendering
+# into a single process (each Chromium subprocess costs ~30 MB RSS plus
+# context-switch overhead) and switch off subsystems a form-filling bot never
+# needs: background networking, extensions, sync, crash reporting, phishing
+# classification, audio, and throttling of "background" renderers. Image
+# decoding is disabled outright -- the submissions only ever hit ipify and
+# the lead form, neither of which needs pixels.
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--single-process',
+    '--no-zygote',
+    '--disable-features=site-per-process,TranslateUI,BlinkGenPropertyTrees',
+    '--disable-background-networking',
+    '--disable-extensions',
+    '--disable-default-apps',
+    '--mute-audio',
+    '--disable-sync',
+    '--disable-breakpad',
+    '--disable-client-side-phishing-detection',
+    '--disable-renderer-backgrounding',
+    '--disable-ipc-flooding-protection',
+    '--blink-settings=imagesEnabled=false',
+]
+
+# How long a caller waits for a free browser before giving up (seconds).
+ACQUIRE_TIMEOUT = int(os.environ.get('BROWSER_POOL_ACQUIRE_TIMEOUT', '60'))
+
+# --- Event loop thread (per worker process) ---
+# All Playwright objects live on this one asyncio loop; Flask views post
+# coroutines to it via run(). One OS thread juggles every in-flight page
+# load, so a submission waiting on the proxy costs no thread at all.
+_loop = None
+_loop_ready = threading.Event()
+_loop_lock = threading.Lock()
+
+# --- Pool state (owned by the loop thread) ---
+_playwright = None
+_browsers = None  # asyncio.Queue of idle Browser objects
+_init_lock = None  # asyncio.Lock, created lazily on the loop
+_initialized = False
+_live_slots = 0
+
+
+def _run_loop(loop):
+    asyncio.set_event_loop(loop)
+    _loop_ready.set()
+    loop.run_forever()
+
+
+def ensure_loop():
+    """Start the dedicated event loop thread (once) and return the loop."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=_run_loop, args=(_loop,), name='browser-pool-loop', daemon=True
+            )
+            thread.start()
+            _loop_ready.wait()
+    return _loop
+
+
+def run(coro, timeout=None):
+    """
+    Run a coroutine on the pool's event loop from any thread and block for
+    its result. This is the bridge the (sync) Flask views use.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, ensure_loop())
+    return future.result(timeout)
+
+
+async def launch_browser():
+    """
+    Launch one Chromium instance on the pool loop, installing the browser
+    first if the executable is missing (fresh hosts).
+    """
+    global _playwright
+    if _playwright is None:
+        from playwright.async_api import async_playwright
+        _playwright = await async_playwright().start()
+    try:
+        return await _playwright.chromium.launch(headless=False, args=CHROMIUM_ARGS)
+    except Exception as launch_err:
+        if "executable doesn't exist" not in str(launch_err).lower():
+            raise
+        logger.info("Browser executable not found. Attempting to install...")
+        import subprocess
+        subprocess.run(["playwright", "install", "chromium", "--with-deps"], check=True)
+        logger.info("Browser installed. Retrying launch...")
+        return await _playwright.chromium.launch(headless=False, args=CHROMIUM_ARGS)
+
+
+async def init_pool_async(size=None):
+    """
+    Pre-warm the browser pool. Safe to call more than once; only the first
+    call in a process does any work.
+    """
+    global _browsers, _init_lock, _initialized, _live_slots
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+    async with _init_lock:
+        if _initialized:
+            return
+        pool_size = size or MAX_WSE
+        _browsers = asyncio.Queue()
+        for _ in range(pool_size):
+            try:
+                await _browsers.put(await launch_browser())
+                _live_slots += 1
+            except Exception as e:
+                logger.error(f"Failed to launch pooled browser: {e}")
+        _initialized = True
+        if _live_slots:
+            logger.info(f"Browser pool initialized with {_live_slots}/{pool_size} browsers.")
+        else:
+            logger.warning("Browser pool initialized with no working browsers.")
+
+
+def init_pool(size=None):
+    """Sync facade for init_pool_async; call at Flask startup."""
+    run(init_pool_async(size), timeout=300)
+
+
+def available():
+    """Whether the pool has been initialized with at least one live browser."""
+    return _initialized and _live_slots > 0
+
+
+@asynccontextmanager
+async def browser_from_pool():
+    """
+    Borrow a pre-warmed browser from the pool for the duration of one
+    submission. Only close contexts created on the yielded browser -- the
+    browser itself goes back in the queue warm for the next caller. Any
+    exception (or a dropped connection) replaces the browser with a freshly
+    launched one.
+    """
+    if not _initialized:
+        await init_pool_async()
+    browser = await asyncio.wait_for(_browsers.get(), timeout=ACQUIRE_TIMEOUT)
+    healthy = True
+    try:
+        yield browser
+    except Exception:
+        healthy = False
+        raise
+    finally:
+        if healthy and browser.is_connected():
+            await _browsers.put(browser)
+        else:
+            global _live_slots
+            logger.warning("Replacing unhealthy pooled browser")
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.error(f"Error closing unhealthy pooled browser: {e}")
+            try:
+                await _browsers.put(await launch_browser())
+            except Exception as e:
+                # Pool shrinks by one slot; better degraded than deadlocked.
+                _live_slots -= 1
+                logger.error(f"Failed to relaunch pooled browser: {e}")
+
+
+async def shutdown_pool_async():
+    """Close all pooled browsers (used on worker shutdown)."""
+    global _initialized, _live_slots
+    if _browsers is None:
+        return
+    while not _browsers.empty():
+        browser = _browsers.get_nowait()
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser: {e}")
+    _initialized = False
+    _live_slots = 0
@@ -0,0 +1,25 @@
+import os
+import multiprocessing
+
+# Gunicorn configuration. The workload is IO-bound (each submission mostly
+# waits on the remote form and the residential proxy). The heavy lifting now
+# runs on browser_pool's dedicated asyncio loop, which multiplexes every
+# in-flight Playwright operation on one thread; the request threads here only
+# parse the form and block on browser_pool.run(). Threaded workers are used
+# rather than gevent because gevent's monkey-patching breaks the asyncio
+# loop thread (and Playwright's own transport) in the same process.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+worker_class = "gthread"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 * multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', '25'))
+
+# Submissions can legitimately take minutes when several proxy timeouts
+# stack up; don't let gunicorn kill the worker mid-submission.
+timeout = 180
+
+# Keep preload off: app import initializes the per-worker browser pool and
+# the in-memory zip database, and both must happen after the fork so every
+# worker owns its own Chromium processes and SQLite connection.
+preload_app = False
@@ -0,0 +1,109 @@
+import math
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Approximate radius of earth in miles (same constant proxy_browser.py uses)
+EARTH_RADIUS_MILES = 3958.8
+
+# Grid cell size in degrees. One degree of latitude is ~69 miles, so 0.5
+# degree cells mean a 25-mile radius query only has to scan a small
+# neighborhood of buckets instead of all ~40k centroids.
+CELL_SIZE_DEG = 0.5
+
+# Miles per degree of latitude, used to convert a radius into a cell span.
+_MILES_PER_DEG_LAT = 69.0
+
+
+def _haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two coordinates, in miles."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_MILES * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+class ZipIndex:
+    """
+    In-process nearest-neighbor index over zip code centroids.
+
+    The uszipcode package answers radius queries by issuing SQL through a
+    full ORM stack for a dataset that easily fits in RAM. This index loads
+    every (zipcode, lat, lng) row once and buckets the centroids into a
+    coarse lat/lng grid; a radius query then scans only the grid cells the
+    radius can touch and sorts the survivors by haversine distance, without
+    touching SQLite at all.
+    """
+
+    def __init__(self):
+        self._cells = {}   # (cell_lat, cell_lng) -> [(lat, lng, zipcode), ...]
+        self._coords = {}  # zipcode -> (lat, lng)
+
+    def __len__(self):
+        return len(self._coords)
+
+    @staticmethod
+    def _cell_of(lat, lng):
+        return (int(math.floor(lat / CELL_SIZE_DEG)), int(math.floor(lng / CELL_SIZE_DEG)))
+
+    def add(self, zipcode, lat, lng):
+        """Insert one centroid. Rows with missing coordinates are skipped."""
+        if lat is None or lng is None:
+            return
+        zipcode = str(zipcode)
+        self._coords[zipcode] = (lat, lng)
+        self._cells.setdefault(self._cell_of(lat, lng), []).append((lat, lng, zipcode))
+
+    def coords(self, zipcode):
+        """Returns (lat, lng) for a zip code, or None if unknown."""
+        return self._coords.get(str(zipcode))
+
+    def nearby(self, lat, lng, radius_miles, max_results, exclude=None):
+        """
+        Zip codes within radius_miles of (lat, lng), nearest first.
+        Args:
+            lat, lng (float): Center of the search.
+            radius_miles (float): Search radius in miles.
+            max_results (int): Maximum number of zips to return.
+            exclude (str): Optional zip code to leave out (usually the target).
+        Returns:
+            list: Zip code strings sorted by distance.
+        """
+        # How many cells the radius can span in each direction. Longitude
+        # degrees shrink with latitude, so widen the span accordingly.
+        lat_span = int(math.ceil(radius_miles / _MILES_PER_DEG_LAT / CELL_SIZE_DEG))
+        cos_lat = max(math.cos(math.radians(lat)), 0.01)
+        lng_span = int(math.ceil(radius_miles / (_MILES_PER_DEG_LAT * cos_lat) / CELL_SIZE_DEG))
+
+        center_cell = self._cell_of(lat, lng)
+        matches = []
+        for cell_lat in range(center_cell[0] - lat_span, center_cell[0] + lat_span + 1):
+            for cell_lng in range(center_cell[1] - lng_span, center_cell[1] + lng_span + 1):
+                for z_lat, z_lng, zipcode in self._cells.get((cell_lat, cell_lng), ()):
+                    if exclude is not None and zipcode == exclude:
+                        continue
+                    distance = _haversine_miles(lat, lng, z_lat, z_lng)
+                    if distance <= radius_miles:
+                        matches.append((distance, zipcode))
+
+        matches.sort()
+        return [zipcode for _, zipcode in matches[:max_results]]
+
+    @classmethod
+    def from_engine(cls, engine):
+        """
+        Build an index from the uszipcode SQLAlchemy engine with one textual
+        SELECT over the simple_zipcode table (no ORM row materialization).
+        """
+        from sqlalchemy import text
+
+        index = cls()
+        with engine.connect() as conn:
+            for zipcode, lat, lng in conn.execute(
+                text("SELECT zipcode, lat, lng FROM simple_zipcode")
+            ):
+                index.add(zipcode, lat, lng)
+        logger.info(f"Zip index built with {len(index)} centroids.")
+        return index